@@ -3,13 +3,18 @@ Processeur VAD utilisant Pyannote avec post-processing et gestion d'erreurs robu
 """
 
 import os
+import io
+import sys
+import contextlib
+import functools
 import hashlib
 import json
-import tempfile
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple, Union
 import time
 
+import numpy as np
+import orjson
 import torch
 import torchaudio
 import soundfile as sf
@@ -20,6 +25,16 @@ from loguru import logger
 
 from ..utils.token_manager import TokenManager
 
+# libyaml (CSafeLoader) est 10-30x plus rapide que le loader pur Python
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_path: str, mtime: float) -> dict:
+    """Parse le YAML une seule fois par (chemin, mtime du fichier)."""
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=_YAML_LOADER)
+
 
 class VADProcessor:
     """
@@ -47,14 +62,17 @@ class VADProcessor:
         self.last_processed_hash = None
         self.last_result = None
         self.initialization_error = None
+        self._autocast_dtype = None
+        self._prerequisites = None
         
         logger.info(f"VADProcessor initialisé sur device: {self.device_str}")
 
     def _load_config(self, config_path: str) -> dict:
         """Charge la configuration depuis un fichier YAML."""
         try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+            # Cache module-level keyé par (chemin, mtime): le YAML n'est
+            # reparsé que s'il a changé sur disque
+            config = _load_config_cached(config_path, os.path.getmtime(config_path))
             logger.info(f"Configuration chargée depuis {config_path}")
             return config
         except Exception as e:
@@ -69,7 +87,8 @@ class VADProcessor:
                 "onset": 0.30,
                 "offset": 0.25,
                 "min_duration_on": 0.20,
-                "min_duration_off": 0.10
+                "min_duration_off": 0.10,
+                "precision": "fp32"
             }
 
     def initialize_pipeline(self, hf_token: Union[str, None] = None) -> dict:
@@ -116,7 +135,21 @@ class VADProcessor:
             
             # Déplacement sur le device
             self.pipeline = self.pipeline.to(self.device)
-            
+
+            # Batch des fenêtres de segmentation: un forward sur B fenêtres
+            # au lieu de B forwards séquentiels
+            self._configure_batch_size()
+
+            # Précision réduite sur GPU: moitié moins d'octets de poids,
+            # throughput tensor-core doublé sur le backbone de segmentation
+            self._apply_precision()
+
+            # Quantization int8 dynamique en repli CPU
+            self._apply_cpu_quantization()
+
+            # Compilation du backbone: kernels fusionnés, dispatch Python éliminé
+            self._compile_model()
+
             logger.info(f"Pipeline VAD initialisée avec succès sur {self.device_str}")
             self.initialization_error = None
             
@@ -137,46 +170,194 @@ class VADProcessor:
                 "error_type": type(e).__name__
             }
 
-    def _extract_audio_from_video(self, video_path: str) -> str:
-        """Extrait l'audio d'une vidéo en WAV mono 16kHz."""
+    def _configure_batch_size(self) -> None:
+        """
+        Configure le nombre de fenêtres de segmentation évaluées par forward.
+        L'Inference pyannote sous-jacente sait empiler les fenêtres glissantes
+        en un batch (B, 1, T); on lui passe simplement la taille configurée
+        au lieu de la laisser à 1.
+        """
+        batch_size = int(self.config.get("batch_size", 32))
         try:
-            # Créer le dossier temporaire
-            os.makedirs(".tmp", exist_ok=True)
-            
-            # Nom du fichier de sortie
-            video_name = Path(video_path).stem
-            audio_path = f".tmp/{video_name}.wav"
-            
-            # Extraction avec ffmpeg
+            self.pipeline._segmentation.batch_size = batch_size
+            logger.info(f"Batch de segmentation: {batch_size} fenêtres par forward")
+        except Exception as e:
+            logger.warning(f"Batch de segmentation non configuré: {e}")
+
+    def _apply_precision(self) -> None:
+        """
+        Applique la précision configurée (fp16/bf16/fp32) au modèle de
+        segmentation. FP32 conservé sur CPU, bf16 replié en fp16 si le
+        matériel CUDA ne le supporte pas.
+        """
+        precision = self.config.get("precision", "fp32")
+        if precision not in ("fp16", "bf16") or self.device.type not in ("cuda", "mps"):
+            return
+
+        try:
+            dtype = torch.bfloat16 if precision == "bf16" else torch.float16
+            if dtype == torch.bfloat16 and self.device.type == "cuda" and not torch.cuda.is_bf16_supported():
+                dtype = torch.float16
+
+            self.pipeline._segmentation.model.to(dtype)
+            self._autocast_dtype = dtype
+            logger.info(f"Modèle de segmentation casté en {dtype} sur {self.device_str}")
+
+        except Exception as e:
+            logger.warning(f"Précision {precision} non appliquée, FP32 conservé: {e}")
+            self._autocast_dtype = None
+
+    def _apply_cpu_quantization(self) -> None:
+        """
+        Quantize dynamiquement les couches Linear/LSTM du modèle de
+        segmentation en int8 quand on tourne sur CPU: 4x moins d'octets de
+        poids et GEMM int8 via FBGEMM/oneDNN.
+
+        Désactivé par défaut (cpu_quantization dans la config): la
+        quantization perturbe légèrement les scores, les seuils onset/offset
+        peuvent demander un re-réglage en mode int8.
+        """
+        if self.device.type != "cpu" or not self.config.get("cpu_quantization", False):
+            return
+
+        try:
+            inner = self.pipeline._segmentation.model
+            self.pipeline._segmentation.model = torch.quantization.quantize_dynamic(
+                inner, {torch.nn.Linear, torch.nn.LSTM}, dtype=torch.qint8
+            )
+            logger.info("Modèle de segmentation quantizé en int8 (CPU)")
+
+        except Exception as e:
+            logger.warning(f"Quantization int8 impossible, FP32 conservé: {e}")
+
+    def _compile_model(self) -> None:
+        """
+        Compile le modèle de segmentation avec torch.compile (ou TorchScript
+        en repli) pour supprimer l'overhead de dispatch Python sur les
+        milliers de forward par fichier long. Warmup sur 1 s de silence pour
+        que la compilation se fasse avant la première requête utilisateur.
+        """
+        if not self.config.get("torch_compile", True):
+            return
+
+        inner = self.pipeline._segmentation.model
+        try:
+            if hasattr(torch, "compile"):
+                self.pipeline._segmentation.model = torch.compile(
+                    inner, mode="reduce-overhead", fullgraph=False
+                )
+            else:
+                self.pipeline._segmentation.model = torch.jit.script(inner)
+
+            # Warmup: déclenche la compilation hors du chemin utilisateur,
+            # sous les mêmes contextes (inference_mode + autocast) que
+            # l'inférence réelle
+            if self._autocast_dtype is not None:
+                autocast_ctx = torch.autocast(device_type=self.device.type,
+                                              dtype=self._autocast_dtype)
+            else:
+                autocast_ctx = contextlib.nullcontext()
+
+            warmup = {"waveform": torch.zeros(1, 16000), "sample_rate": 16000}
+            with torch.inference_mode(), autocast_ctx:
+                self.pipeline(warmup)
+
+            logger.info("Modèle de segmentation compilé (warmup effectué)")
+
+        except Exception as e:
+            # Revenir au modèle eager d'origine: sinon le modèle compilé
+            # resterait en place malgré le message
+            self.pipeline._segmentation.model = inner
+            logger.warning(f"Compilation du modèle impossible, mode eager conservé: {e}")
+
+    def _extract_audio_from_video(self, video_path: str,
+                                  data: Optional[bytes] = None) -> Tuple["np.ndarray", int]:
+        """
+        Extrait l'audio d'une vidéo en PCM mono 16kHz, directement en mémoire.
+
+        ffmpeg décode vers stdout en s16le brut, sans fichier WAV temporaire:
+        on évite l'encodage/décodage WAV et le nettoyage disque. Si `data` est
+        fourni (contenu déjà lu en mémoire), il est streamé via stdin pour
+        éviter une relecture du fichier sur disque.
+
+        Args:
+            video_path: Chemin vers le fichier vidéo
+            data: Contenu brut du fichier, si déjà en mémoire
+
+        Returns:
+            Tuple (waveform float32 normalisé, sample_rate)
+        """
+        try:
+            # Extraction avec ffmpeg vers stdout (PCM brut)
             import subprocess
             cmd = [
-                "ffmpeg", "-i", video_path,
+                "ffmpeg", "-nostdin" if data is None else "-hide_banner",
+                "-i", "pipe:0" if data is not None else video_path,
                 "-vn",  # Pas de vidéo
                 "-ac", "1",  # Mono
                 "-ar", "16000",  # 16kHz
-                "-acodec", "pcm_s16le",  # WAV 16-bit
-                "-y",  # Écraser si existe
-                audio_path
+                "-f", "s16le",  # PCM brut 16-bit
+                "-loglevel", "error",
+                "pipe:1"
             ]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                raise Exception(f"ffmpeg error: {result.stderr}")
-            
-            logger.info(f"Audio extrait: {video_path} → {audio_path}")
-            return audio_path
-            
+
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE if data is not None else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE
+            )
+            raw, stderr = proc.communicate(input=data)
+            if proc.returncode != 0:
+                raise Exception(f"ffmpeg error: {stderr.decode(errors='replace')}")
+
+            # Conversion int16 → float32 normalisé [-1, 1]
+            waveform = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+
+            logger.info(f"Audio extrait en mémoire: {video_path} ({len(waveform)} échantillons)")
+            return waveform, 16000
+
         except Exception as e:
             logger.error(f"Erreur extraction audio: {e}")
             raise
 
     def _get_file_hash(self, file_path: str) -> str:
         """Calcule le hash SHA-256 d'un fichier."""
-        hash_sha256 = hashlib.sha256()
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            # file_digest (3.11+): boucle de lecture en C, GIL relâché
+            if sys.version_info >= (3, 11):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+
+            hash_sha256 = hashlib.sha256()
+            # 1 MiB par bloc: amortit le coût des appels C de hashlib
+            while chunk := f.read(1 << 20):
                 hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+            return hash_sha256.hexdigest()
+
+    CACHE_DIR = "reports/.vad_cache"
+
+    def _load_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Charge un résultat VAD depuis le cache disque, ou None si absent."""
+        cache_file = f"{self.CACHE_DIR}/{cache_key}.json"
+        try:
+            if os.path.exists(cache_file):
+                with open(cache_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Erreur lecture cache VAD: {e}")
+        return None
+
+    def _save_cached_result(self, cache_key: str, results: Dict[str, Any]) -> None:
+        """Écrit un résultat VAD dans le cache disque (écriture atomique)."""
+        try:
+            os.makedirs(self.CACHE_DIR, exist_ok=True)
+            cache_file = f"{self.CACHE_DIR}/{cache_key}.json"
+            tmp_file = f"{cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False)
+            os.replace(tmp_file, cache_file)
+        except Exception as e:
+            logger.warning(f"Erreur écriture cache VAD: {e}")
 
     def _post_process_segments(self, segments: List, audio_duration: float) -> List:
         """
@@ -190,57 +371,59 @@ class VADProcessor:
             Liste de segments post-traités (objets pyannote)
         """
         try:
-            processed_segments = []
-            
-            for segment in segments:
-                start = segment.start
-                end = segment.end
-                
-                # Filtrage par durée minimale
-                duration = end - start
-                if duration < self.config["min_duration_s"]:
-                    continue
-                
-                # Application des marges
-                start = max(0, start - self.config["margin_s"])
-                end = min(audio_duration, end + self.config["margin_s"])
-                
-                # Créer un nouveau segment pyannote avec les marges appliquées
-                from pyannote.core import Segment
-                processed_segments.append(Segment(start, end))
-            
-            # Fusion des segments proches
-            if processed_segments and self.config["merge_gap_s"] > 0:
-                merged = []
-                current = processed_segments[0]
-                
-                for next_seg in processed_segments[1:]:
-                    if next_seg.start - current.end <= self.config["merge_gap_s"]:
-                        # Fusion en créant un nouveau segment étendu
-                        current = Segment(current.start, next_seg.end)
-                    else:
-                        # Nouveau segment
-                        merged.append(current)
-                        current = next_seg
-                
-                merged.append(current)
-                processed_segments = merged
-            
+            from pyannote.core import Segment
+
+            # Passage en tableau (N, 2) [start, end] pour un traitement
+            # vectorisé: pas d'objets Segment intermédiaires
+            if isinstance(segments, np.ndarray):
+                # Déjà un tableau (N, 2) [start, end] (chemin scores bruts)
+                arr = segments.astype(np.float32, copy=True).reshape(-1, 2)
+            else:
+                arr = np.array(
+                    [(s.start, s.end) for s in segments],
+                    dtype=np.float32
+                ).reshape(-1, 2)
+
+            # Filtrage par durée minimale
+            mask = (arr[:, 1] - arr[:, 0]) >= self.config["min_duration_s"]
+            arr = arr[mask]
+
+            # Application des marges (clip aux bornes de l'audio)
+            margin = self.config["margin_s"]
+            arr[:, 0] = np.maximum(0, arr[:, 0] - margin)
+            arr[:, 1] = np.minimum(audio_duration, arr[:, 1] + margin)
+
+            # Fusion des segments proches: on coupe là où le gap dépasse le seuil
+            if len(arr) > 0 and self.config["merge_gap_s"] > 0:
+                gaps = arr[1:, 0] - arr[:-1, 1]
+                breaks = np.where(gaps > self.config["merge_gap_s"])[0] + 1
+                starts = arr[np.r_[0, breaks], 0]
+                ends = arr[np.r_[breaks - 1, len(arr) - 1], 1]
+            else:
+                starts = arr[:, 0]
+                ends = arr[:, 1]
+
+            # Objets Segment créés uniquement pour le petit tableau final
+            processed_segments = [Segment(float(s), float(e)) for s, e in zip(starts, ends)]
+
             logger.info(f"Post-traitement: {len(segments)} segments → {len(processed_segments)} segments")
-            
+
             return processed_segments
-            
+
         except Exception as e:
             logger.error(f"Erreur post-traitement: {e}")
             return []
 
-    def process_audio(self, file_path: str) -> Dict[str, Any]:
+    def process_audio(self, file_path: str,
+                      precomputed_hash: Optional[str] = None) -> Dict[str, Any]:
         """
         Traite un fichier audio/vidéo avec VAD.
-        
+
         Args:
             file_path: Chemin vers le fichier audio/vidéo
-            
+            precomputed_hash: SHA-256 déjà calculé par l'appelant (évite de
+                re-hasher des octets qu'il avait déjà en mémoire)
+
         Returns:
             Dict avec résultats et métadonnées
         """
@@ -249,7 +432,7 @@ class VADProcessor:
         try:
             # Vérification de l'initialisation
             if not self.pipeline:
-                if not self.initialize_pipeline():
+                if not self.initialize_pipeline()["success"]:
                     return {
                         "success": False,
                         "error": self.initialization_error or "Pipeline non initialisée",
@@ -260,72 +443,254 @@ class VADProcessor:
             file_ext = Path(file_path).suffix.lower()
             is_video = file_ext in ['.mp4', '.mkv', '.avi', '.mov']
             
-            # Extraction audio si vidéo
-            if is_video:
-                audio_path = self._extract_audio_from_video(file_path)
-                input_type = "video"
+            # Hash seul via file_digest (boucle de lecture en C, sans
+            # bufferiser le fichier en mémoire), sauté si l'appelant
+            # fournit déjà le hash
+            if precomputed_hash is not None:
+                file_hash = precomputed_hash
             else:
-                audio_path = file_path
-                input_type = "audio"
-            
-            # Calcul du hash du fichier
-            file_hash = self._get_file_hash(file_path)
-            
-            # Lecture de l'audio
-            waveform, sample_rate = sf.read(audio_path)
+                file_hash = self._get_file_hash(file_path)
+
+            # Vérification des caches (mémoire puis disque)
+            cache_key = self._build_cache_key(file_hash)
+            cached = self._check_caches(cache_key, file_path)
+            if cached is not None:
+                return cached
+
+            # Lecture sur miss uniquement: les pages sont encore chaudes
+            # dans le page cache après le passage du hash
+            file_bytes = Path(file_path).read_bytes()
+
+            # Extraction audio en mémoire si vidéo, sinon décodage des octets
+            # déjà lus (pas de seconde lecture disque)
+            waveform, sample_rate = self._decode_bytes(file_path, file_bytes, is_video)
+            input_type = "video" if is_video else "audio"
+
+            return self._run_inference(waveform, sample_rate, file_path,
+                                       input_type, cache_key, start_time)
+
+        except Exception as e:
+            logger.error(f"Erreur traitement VAD: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__
+            }
+
+    def process_audio_bytes(self, data: bytes, filename: str) -> Dict[str, Any]:
+        """
+        Traite un upload déjà en mémoire, sans passer par un fichier
+        temporaire: les octets sont hashés puis décodés directement
+        (soundfile pour l'audio, ffmpeg via stdin pour la vidéo).
+
+        Args:
+            data: Contenu brut du fichier uploadé
+            filename: Nom du fichier (l'extension sert au routage audio/vidéo)
+
+        Returns:
+            Dict avec résultats et métadonnées
+        """
+        start_time = time.time()
+
+        try:
+            # Vérification de l'initialisation
+            if not self.pipeline:
+                if not self.initialize_pipeline()["success"]:
+                    return {
+                        "success": False,
+                        "error": self.initialization_error or "Pipeline non initialisée",
+                        "health": self.check_prerequisites()
+                    }
+
+            # Détermination du type de fichier
+            file_ext = Path(filename).suffix.lower()
+            is_video = file_ext in ['.mp4', '.mkv', '.avi', '.mov']
+
+            # Hash direct des octets en mémoire, puis caches
+            file_hash = hashlib.sha256(data).hexdigest()
+            cache_key = self._build_cache_key(file_hash)
+            cached = self._check_caches(cache_key, filename)
+            if cached is not None:
+                return cached
+
+            waveform, sample_rate = self._decode_bytes(filename, data, is_video)
+            input_type = "video" if is_video else "audio"
+
+            return self._run_inference(waveform, sample_rate, filename,
+                                       input_type, cache_key, start_time)
+
+        except Exception as e:
+            logger.error(f"Erreur traitement VAD: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "error_type": type(e).__name__
+            }
+
+    def _build_cache_key(self, file_hash: str) -> str:
+        """Clé de cache: fichier + config + modèle, pour invalider si on change les seuils ou le modèle."""
+        return hashlib.sha256(
+            f"{file_hash}|{json.dumps(self.config, sort_keys=True)}|{self.model_id}".encode()
+        ).hexdigest()
+
+    def _check_caches(self, cache_key: str, file_path: str) -> Optional[Dict[str, Any]]:
+        """Consulte les caches mémoire puis disque; retourne le résultat ou None."""
+        # Cache en mémoire (même fichier re-analysé dans la session)
+        if self.last_processed_hash == cache_key and self.last_result is not None:
+            logger.info(f"Résultat VAD en cache (mémoire): {file_path}")
+            return self.last_result
+
+        # Cache sur disque (fichier déjà analysé lors d'une session précédente)
+        cached = self._load_cached_result(cache_key)
+        if cached is not None:
+            logger.info(f"Résultat VAD en cache (disque): {file_path}")
+            self.last_processed_hash = cache_key
+            self.last_result = cached
+            return cached
+
+        return None
+
+    def _decode_bytes(self, file_path: str, file_bytes: bytes,
+                      is_video: bool) -> Tuple["np.ndarray", int]:
+        """Décode les octets déjà en mémoire en waveform float32."""
+        if is_video:
+            return self._extract_audio_from_video(file_path, data=file_bytes)
+        return sf.read(io.BytesIO(file_bytes), dtype='float32')
+
+    def _segments_from_raw_scores(self, vad_input: Dict[str, Any]) -> "np.ndarray":
+        """
+        Binarise les scores trame par trame du modèle de segmentation en un
+        passage NumPy vectorisé (seuil onset), au lieu de la boucle Python
+        de binarisation de pyannote.
+
+        Pas d'hystérésis onset/offset ni de min_duration_on/off ici: le
+        post-traitement aval filtre les segments courts et fusionne les gaps.
+
+        Args:
+            vad_input: Dict {"waveform": tensor, "sample_rate": int}
+
+        Returns:
+            Tableau (N, 2) float32 de [start, end] en secondes
+        """
+        scores = self.pipeline._segmentation(vad_input)
+        data = np.asarray(scores.data)
+        if data.ndim > 1:
+            # Activité vocale toutes classes confondues
+            data = data.max(axis=1)
+
+        active = data > self.config["onset"]
+        if active.size == 0:
+            return np.empty((0, 2), dtype=np.float32)
+
+        # Transitions silence→parole (+1) et parole→silence (-1)
+        transitions = np.diff(active.astype(np.int8))
+        starts = np.where(transitions == 1)[0] + 1
+        ends = np.where(transitions == -1)[0] + 1
+        if active[0]:
+            starts = np.r_[0, starts]
+        if active[-1]:
+            ends = np.r_[ends, len(active)]
+
+        # Indices de trames → secondes
+        frames = scores.sliding_window
+        arr = np.empty((len(starts), 2), dtype=np.float32)
+        arr[:, 0] = frames.start + starts * frames.step
+        arr[:, 1] = frames.start + ends * frames.step
+        return arr
+
+    def _run_inference(self, waveform: "np.ndarray", sample_rate: int,
+                       file_path: str, input_type: str, cache_key: str,
+                       start_time: float) -> Dict[str, Any]:
+        """
+        Exécute l'inférence VAD sur un waveform décodé, post-traite les
+        segments et construit/sauvegarde le résultat final.
+        """
+        try:
             audio_duration = len(waveform) / sample_rate
-            
+
             logger.info(f"Traitement {input_type}: {file_path} ({audio_duration:.2f}s)")
-            
+
             # Inférence VAD avec paramètres de binarisation
-            vad_result = self.pipeline(audio_path)
-            
-            # Log de la sortie brute pyannote pour debug
-            logger.info(f"Sortie pyannote: {type(vad_result)}")
-            
-            # Extraction des segments (garder les objets pyannote)
-            segments = []
-            if hasattr(vad_result, "get_timeline"):
-                # Format Annotation standard
-                timeline = vad_result.get_timeline()
-                logger.info(f"Timeline pyannote: {len(timeline)} segments")
-                for i, segment in enumerate(timeline[:5]):  # Log des 5 premiers
-                    logger.info(f"Segment {i}: {segment.start:.2f}s - {segment.end:.2f}s")
-                segments = list(timeline)  # Garder les objets pyannote
-            elif isinstance(vad_result, dict) and "speech" in vad_result:
-                # Format dict avec clé "speech"
-                timeline = vad_result["speech"].get_timeline()
-                logger.info(f"Timeline speech: {len(timeline)} segments")
-                segments = list(timeline)
+            # Pyannote accepte nativement un waveform en mémoire (channel, time)
+            tensor = torch.from_numpy(waveform)
+            if tensor.ndim == 1:
+                tensor = tensor.unsqueeze(0)
+            else:
+                tensor = tensor.T
+            if self.device.type == "cuda":
+                # Mémoire épinglée: les copies H2D des batches de fenêtres
+                # deviennent asynchrones et se recouvrent avec le calcul GPU
+                tensor = tensor.pin_memory()
+            vad_input = {"waveform": tensor, "sample_rate": sample_rate}
+            if self._autocast_dtype is not None:
+                # Même device que le cast de _apply_precision (cuda ou mps):
+                # sans autocast, les entrées fp32 heurtent les poids fp16
+                autocast_ctx = torch.autocast(device_type=self.device.type,
+                                              dtype=self._autocast_dtype)
+            else:
+                autocast_ctx = contextlib.nullcontext()
+
+            with torch.inference_mode(), autocast_ctx:
+                if self.config.get("raw_scores", False):
+                    # Seuillage vectorisé des scores bruts, sans passer par
+                    # la binarisation Python de pyannote
+                    vad_result = None
+                    segments = self._segments_from_raw_scores(vad_input)
+                else:
+                    vad_result = self.pipeline(vad_input)
+
+            if vad_result is None:
+                logger.info(f"Scores bruts binarisés: {len(segments)} segments")
             else:
-                logger.warning(f"Format de sortie pyannote inattendu: {type(vad_result)}")
+                # Log de la sortie brute pyannote pour debug
+                logger.info(f"Sortie pyannote: {type(vad_result)}")
+
+                # Extraction des segments (garder les objets pyannote)
+                # en une seule traversée de l'Annotation
                 segments = []
+                if hasattr(vad_result, "itertracks"):
+                    # Format Annotation standard
+                    segments = [seg for seg, _ in vad_result.itertracks()]
+                    logger.info(f"Timeline pyannote: {len(segments)} segments")
+                elif isinstance(vad_result, dict) and "speech" in vad_result:
+                    # Format dict avec clé "speech"
+                    segments = [seg for seg, _ in vad_result["speech"].itertracks()]
+                    logger.info(f"Timeline speech: {len(segments)} segments")
+                else:
+                    logger.warning(f"Format de sortie pyannote inattendu: {type(vad_result)}")
+                    segments = []
+
+                # Aperçu des premiers segments: formaté uniquement si le
+                # niveau DEBUG est actif
+                logger.opt(lazy=True).debug(
+                    "Premiers segments: {}",
+                    lambda: ", ".join(
+                        f"{s.start:.2f}s-{s.end:.2f}s" for s in segments[:5]
+                    )
+                )
             
             # Post-traitement sur objets pyannote
             processed_segments = self._post_process_segments(segments, audio_duration)
             
             # Conversion en dict seulement à la fin
-            final_segments = []
-            for segment in processed_segments:
-                final_segments.append({
+            # (troncature à la ms via int(x*1000)/1000, moins cher que round)
+            final_segments = [
+                {
                     "type": "speech",
-                    "start": round(segment.start, 3),
-                    "end": round(segment.end, 3),
+                    "start": int(segment.start * 1000) / 1000,
+                    "end": int(segment.end * 1000) / 1000,
                     "confidence": None,
-                    "duration": round(segment.end - segment.start, 3)
-                })
+                    "duration": int((segment.end - segment.start) * 1000) / 1000
+                }
+                for segment in processed_segments
+            ]
             
             # Calcul des métriques
             processing_time = time.time() - start_time
             rtf = processing_time / audio_duration if audio_duration > 0 else 0
             
             logger.info(f"VAD terminé: {len(final_segments)} segments, RTF: {rtf:.3f}")
-            
-            # Nettoyage des fichiers temporaires
-            if is_video and os.path.exists(audio_path):
-                os.remove(audio_path)
-                logger.info(f"Fichier temporaire supprimé: {audio_path}")
-            
+
             # Construction du résultat final
             results = {
                 "success": True,
@@ -346,7 +711,12 @@ class VADProcessor:
             
             # Sauvegarde des résultats
             self.save_results(results, file_path)
-            
+
+            # Mise en cache (mémoire + disque) pour les uploads identiques
+            self.last_processed_hash = cache_key
+            self.last_result = results
+            self._save_cached_result(cache_key, results)
+
             return results
             
         except Exception as e:
@@ -358,23 +728,29 @@ class VADProcessor:
             }
 
     def check_prerequisites(self) -> Dict[str, Any]:
-        """Vérifie les prérequis du système."""
+        """
+        Vérifie les prérequis du système.
+
+        Le résultat est mis en cache sur l'instance: les versions et la
+        présence de ffmpeg ne changent pas en cours de process, et cette
+        méthode est appelée à chaque rerun Streamlit.
+        """
+        if self._prerequisites is not None:
+            return self._prerequisites
+
         try:
             # Vérification des dépendances
             import torch
             import torchaudio
             import soundfile
             import yaml
-            
-            # Vérification de ffmpeg pour l'extraction vidéo
-            import subprocess
-            try:
-                subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
-                ffmpeg_available = True
-            except (subprocess.CalledProcessError, FileNotFoundError):
-                ffmpeg_available = False
-            
-            return {
+
+            # Vérification de ffmpeg: simple lookup dans le PATH,
+            # pas de subprocess
+            import shutil
+            ffmpeg_available = shutil.which("ffmpeg") is not None
+
+            self._prerequisites = {
                 "torch_version": torch.__version__,
                 "torchaudio_version": torchaudio.__version__,
                 "device": self.device_str,
@@ -382,7 +758,8 @@ class VADProcessor:
                 "config_loaded": bool(self.config),
                 "token_available": bool(self.token)
             }
-            
+            return self._prerequisites
+
         except ImportError as e:
             return {"error": f"Import manquant: {e}"}
         except Exception as e:
@@ -408,9 +785,14 @@ class VADProcessor:
             timestamp = int(time.time())
             output_file = f"reports/{source_name}_vad_{timestamp}.json"
             
-            # Sauvegarde
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f, indent=2, ensure_ascii=False)
+            # Sauvegarde (orjson: encodeur C, sortie UTF-8 directe) en un seul
+            # write() sur fd brut, sans buffering texte Python
+            data = orjson.dumps(results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
             
             logger.info(f"Résultats sauvegardés: {output_file}")
             return output_file
@@ -5,16 +5,27 @@ Interface complète avec diagnostic de santé et gestion d'erreurs robuste.
 """
 
 import streamlit as st
-import os
 import platform
 from pathlib import Path
-import tempfile
 import json
 from loguru import logger
 
 # Import des modules VAD
 from src.audio.pipeline.vad_processor import VADProcessor
-from src.audio.utils.token_manager import TokenManager
+from src.audio.utils.token_manager import TokenManager, get_token_manager
+
+
+@st.cache_resource(show_spinner=False)
+def get_vad_processor():
+    """
+    Charge la pipeline VAD une seule fois par process.
+    cache_resource garde l'objet (et son modèle GPU) vivant entre les
+    reruns et le partage entre sessions, sans re-télécharger le modèle.
+    """
+    processor = VADProcessor()
+    init_result = processor.initialize_pipeline()
+    return processor, init_result
+
 
 st.set_page_config(
     page_title="Procteo-Audio - VAD",
@@ -41,8 +52,11 @@ with st.sidebar:
     
     # Vérification complète de la santé
     if st.button("🔍 Vérifier la santé du système", type="primary"):
-        # Créer un statut de santé local
-        token_manager = TokenManager()
+        # Créer un statut de santé local (singleton: survit aux reruns)
+        token_manager = get_token_manager()
+        # Re-lit secrets/env si modifiés depuis le chargement (simple stat
+        # mtime + lookup env): un token ajouté après le lancement est vu ici
+        token_manager.refresh_token()
         token_status = token_manager.get_token_status()
         
         # Vérifier l'accès au modèle si on a un token
@@ -89,33 +103,36 @@ with st.sidebar:
     # Initialisation du processeur VAD
     st.subheader("🚀 Initialisation VAD")
     
-    if st.button("🔧 Initialiser le processeur VAD", type="secondary"):
+    # Initialisation automatique via la factory cachée (une fois par process)
+    if st.session_state.vad_processor is None:
         try:
             with st.spinner("Initialisation en cours..."):
-                vad = VADProcessor()
-                init_result = vad.initialize_pipeline()
-                
+                vad, init_result = get_vad_processor()
+
                 if init_result["success"]:
                     st.session_state.vad_processor = vad
-                    st.success("✅ Processeur VAD initialisé avec succès!")
-                    st.rerun()
                 else:
+                    # Ne pas garder l'échec en cache: le prochain rerun
+                    # retentera (ex: token configuré entre-temps)
+                    get_vad_processor.clear()
                     st.error(f"❌ Échec de l'initialisation: {init_result['message']}")
                     if "details" in init_result:
                         st.error(f"Détails: {init_result['details']}")
         except Exception as e:
+            get_vad_processor.clear()
             st.error(f"❌ Erreur lors de l'initialisation: {str(e)}")
-    
+
     # Statut du processeur
     if st.session_state.vad_processor:
         st.success("✅ Processeur VAD prêt")
-        
+
         # Afficher les informations du processeur
         health_info = st.session_state.vad_processor.get_health_status()
         st.info(f"Device: {health_info['device']}")
         st.info(f"Modèle: {health_info['model']}")
-        
+
         if st.button("🔄 Réinitialiser", type="secondary"):
+            get_vad_processor.clear()
             st.session_state.vad_processor = None
             st.rerun()
 
@@ -154,17 +171,11 @@ if uploaded_file is not None:
         if st.button("🚀 Lancer l'analyse VAD", type="primary"):
             try:
                 with st.spinner("Analyse en cours..."):
-                    # Sauvegarder temporairement le fichier
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                        tmp_file.write(uploaded_file.getvalue())
-                        tmp_path = tmp_file.name
-                    
-                    # Lancer l'analyse
-                    results = st.session_state.vad_processor.process_audio(tmp_path)
-                    
-                    # Nettoyer le fichier temporaire
-                    os.unlink(tmp_path)
-                    
+                    # Analyse directe des octets uploadés, sans fichier temporaire
+                    results = st.session_state.vad_processor.process_audio_bytes(
+                        uploaded_file.getvalue(), uploaded_file.name
+                    )
+
                     if results["success"]:
                         st.success("✅ Analyse terminée avec succès!")
                         
@@ -3,10 +3,190 @@ Gestionnaire de tokens HuggingFace pour l'authentification Pyannote.
 """
 
 import os
+import asyncio
+import hashlib
+import time
+import functools
+import types
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from loguru import logger
 
+# Imports lourds hoistés au niveau module: le lookup de globals est mis en
+# cache par CPython, au lieu de repasser par la machinerie d'import à
+# chaque appel sous les reruns Streamlit
+try:
+    from huggingface_hub import HfApi
+    from huggingface_hub.utils import (
+        GatedRepoError,
+        RepositoryNotFoundError,
+        HfHubHTTPError,
+    )
+    _HF_OK = True
+except ImportError:
+    _HF_OK = False
+
+try:
+    import torch
+    _TORCH_OK = True
+except ImportError:
+    _TORCH_OK = False
+
+try:
+    import aiohttp
+    _AIOHTTP_OK = True
+except ImportError:
+    _AIOHTTP_OK = False
+
+# Table statut HTTP → (message, details); un seul lookup au lieu d'une
+# chaîne de branches et de littéraux dict reconstruits à chaque erreur
+_ERROR_TABLE = {
+    401: ("Token invalide ou expiré",
+          "Vérifiez que votre token HF est valide et non expiré"),
+    403: ("Conditions d'utilisation non acceptées",
+          "Vous devez accepter les conditions d'utilisation pour {model_id} sur HuggingFace"),
+    404: ("Modèle non trouvé",
+          "Le modèle {model_id} n'existe pas ou n'est pas accessible"),
+}
+
+
+def _access_error(code: Optional[int], model_id: str, fallback_message: str) -> Dict[str, Any]:
+    """Construit le dict d'erreur d'accès à partir du statut HTTP."""
+    message, details = _ERROR_TABLE.get(
+        code, (fallback_message, "Vérifiez votre connexion réseau et les permissions")
+    )
+    return {
+        "success": False,
+        "message": message,
+        "details": details.format(model_id=model_id)
+    }
+
+
+class _AccessCheckFailed(Exception):
+    """
+    Porte un résultat d'échec hors de la fonction cachée: st.cache_data ne
+    mémoïze pas les exceptions, donc un échec (réseau transitoire, token
+    invalide) n'est jamais servi depuis le cache.
+    """
+
+    def __init__(self, result: Dict[str, Any]):
+        super().__init__(result.get("message"))
+        self.result = result
+
+
+# Emplacements possibles de secrets.toml (projet local puis home),
+# pour détecter les changements via mtime sans reparser le TOML
+_SECRETS_PATHS = (
+    Path(".streamlit/secrets.toml"),
+    Path.home() / ".streamlit" / "secrets.toml",
+)
+
+
+@functools.cache
+def _detect_device():
+    """Sonde CUDA/MPS une seule fois par process (les probes initialisent le driver)."""
+    if not _TORCH_OK:
+        # Sentinelle str: impossible de construire un torch.device sans torch
+        # (l'ancien fallback `return torch.device("cpu")` sous ImportError
+        # levait UnboundLocalError, torch n'étant jamais lié)
+        return "cpu"
+
+    try:
+        # Priorité: MPS (Mac M1/M2), CUDA, CPU
+        if torch.backends.mps.is_available():
+            return torch.device("mps")
+        if torch.cuda.is_available():
+            return torch.device("cuda")
+    except Exception as e:
+        # Stringification de l'exception différée au formatage du sink
+        logger.opt(exception=False).warning("Erreur détection device: {}, fallback CPU", e)
+    return torch.device("cpu")
+
+
+_http_backend_configured = False
+
+
+def _configure_http_backend() -> None:
+    """
+    Installe une fois pour toutes une Session requests partagée pour les
+    appels hub, avec un pool HTTPS élargi: les appels suivants réutilisent
+    les connexions TCP/TLS (keep-alive) au lieu de renégocier le handshake.
+    """
+    global _http_backend_configured
+    if _http_backend_configured or not _HF_OK:
+        return
+
+    try:
+        import requests
+        from huggingface_hub import configure_http_backend
+
+        def _session_factory():
+            session = requests.Session()
+            session.mount("https://", requests.adapters.HTTPAdapter(
+                pool_connections=4, pool_maxsize=16, max_retries=3
+            ))
+            return session
+
+        configure_http_backend(backend_factory=_session_factory)
+        _http_backend_configured = True
+
+    except Exception as e:
+        logger.warning(f"Backend HTTP HF non configuré: {e}")
+
+
+@functools.cache
+def _hf_api():
+    """Instance HfApi partagée: sa Session requests (pool de connexions) est réutilisée."""
+    return HfApi()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _check_model_access_cached(model_id: str, token_hash: str, _token: str) -> Dict[str, Any]:
+    """
+    Vérification d'accès au modèle, mémoïzée par (model_id, hash du token).
+
+    Le token brut passe par `_token` (préfixe underscore: exclu de la clé de
+    cache Streamlit) pour ne jamais servir de clé; `token_hash` assure
+    l'invalidation quand le token change. Seuls les succès sont mémoïzés:
+    les échecs sortent via _AccessCheckFailed pour ne pas coller un
+    incident transitoire dans le cache pendant tout le TTL.
+    """
+    if not _HF_OK:
+        raise _AccessCheckFailed({
+            "success": False,
+            "message": "huggingface_hub non installé",
+            "details": "Installez huggingface_hub pour vérifier l'accès aux modèles"
+        })
+
+    try:
+        # model_info: quelques centaines d'octets de JSON et aucune écriture
+        # dans le cache HF, contre un GET complet de config.yaml auparavant.
+        # Lève les mêmes exceptions Gated/Repository/Http qu'un download.
+        info = _hf_api().model_info(repo_id=model_id, token=_token, timeout=10)
+
+        return {
+            "success": True,
+            "message": "Accès au modèle confirmé",
+            "model_sha": getattr(info, "sha", None)
+        }
+
+    # Exceptions typées du hub: dispatch sur le type/status code plutôt que
+    # de scanner le message d'erreur complet (GatedRepoError hérite de
+    # RepositoryNotFoundError, d'où l'ordre des clauses)
+    except GatedRepoError:
+        raise _AccessCheckFailed(
+            _access_error(403, model_id, "Conditions d'utilisation non acceptées"))
+    except RepositoryNotFoundError:
+        raise _AccessCheckFailed(
+            _access_error(404, model_id, "Modèle non trouvé"))
+    except HfHubHTTPError as e:
+        code = e.response.status_code if e.response is not None else None
+        raise _AccessCheckFailed(_access_error(code, model_id, f"Erreur d'accès: {e}"))
+    except Exception as e:
+        raise _AccessCheckFailed(_access_error(None, model_id, f"Erreur d'accès: {e}"))
+
 
 class TokenManager:
     """
@@ -17,7 +197,45 @@ class TokenManager:
         """Initialise le gestionnaire de tokens."""
         self.token = None
         self.token_source = None
+        self._secrets_mtime = None
+        self._env_token = None
+        # Cache TTL in-process des vérifications d'accès: retour en ~µs sur
+        # hit, sans la sérialisation de st.cache_data
+        self._access_cache: Dict[tuple, tuple] = {}
+        self.cache_dir = self._resolve_cache_dir()
+        self._configure_hub_env()
+        _configure_http_backend()
         self._load_token()
+
+    @staticmethod
+    def _resolve_cache_dir() -> str:
+        """
+        Résout l'emplacement du cache HuggingFace (HF_HOME prioritaire) et
+        le propage en variable d'environnement pour que les bibliothèques
+        avales (pyannote, transformers) partagent le même cache — important
+        en déploiement conteneurisé où le cache doit viser un volume
+        persistant plutôt que le disque éphémère du pod.
+        """
+        cache_dir = os.environ.get("HUGGINGFACE_HUB_CACHE")
+        if cache_dir:
+            return cache_dir
+
+        # Le cache hub vit sous <HF_HOME>/hub, pas à la racine de HF_HOME:
+        # exporter HF_HOME lui-même détournerait le cache existant
+        hf_home = os.environ.get("HF_HOME") or os.path.expanduser("~/.cache/huggingface")
+        cache_dir = os.path.join(hf_home, "hub")
+        os.environ.setdefault("HUGGINGFACE_HUB_CACHE", cache_dir)
+        return cache_dir
+
+    @staticmethod
+    def _configure_hub_env() -> None:
+        """
+        Active hf_transfer (téléchargement multipart en Rust, >2x de débit
+        sur les gros fichiers du hub) si le paquet est installé.
+        """
+        import importlib.util
+        if importlib.util.find_spec("hf_transfer") is not None:
+            os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
     
     def _load_token(self) -> None:
         """Charge le token depuis les sources disponibles."""
@@ -25,27 +243,52 @@ class TokenManager:
         if hasattr(st, 'secrets') and st.secrets.get("HF_TOKEN"):
             self.token = st.secrets["HF_TOKEN"]
             self.token_source = "streamlit_secrets"
-            logger.info("Token HF chargé depuis Streamlit secrets")
         elif os.environ.get("HUGGINGFACE_HUB_TOKEN"):
             self.token = os.environ["HUGGINGFACE_HUB_TOKEN"]
             self.token_source = "environment"
-            logger.info("Token HF chargé depuis variables d'environnement")
         else:
             self.token = None
             self.token_source = None
+
+        # Formatage différé: la chaîne n'est construite que si le sink
+        # accepte le niveau (TokenManager est réinstancié à chaque rerun)
+        if self.token:
+            logger.opt(lazy=True).info(
+                "Token HF chargé depuis {}", lambda: self.token_source
+            )
+        else:
             logger.warning("Aucun token HF trouvé")
+
+        # État des sources au moment du chargement: refresh_token compare
+        # ces valeurs (un stat + un lookup env) avant de tout relire
+        self._secrets_mtime = self._secrets_mtime_now()
+        self._env_token = os.environ.get("HUGGINGFACE_HUB_TOKEN")
+
+        # Statut précalculé (immuable): il ne change qu'au rechargement du
+        # token, inutile de reconstruire un dict à chaque rerun Streamlit
+        self._status = types.MappingProxyType({
+            "available": bool(self.token),
+            "source": self.token_source,
+            "length": len(self.token) if self.token else 0
+        })
+
+    @staticmethod
+    def _secrets_mtime_now() -> Optional[float]:
+        """mtime du premier secrets.toml trouvé, ou None."""
+        for path in _SECRETS_PATHS:
+            try:
+                return path.stat().st_mtime
+            except OSError:
+                continue
+        return None
     
     def get_token(self) -> Optional[str]:
         """Retourne le token HF chargé."""
         return self.token
     
     def get_token_status(self) -> Dict[str, Any]:
-        """Retourne le statut du token."""
-        return {
-            "available": bool(self.token),
-            "source": self.token_source,
-            "length": len(self.token) if self.token else 0
-        }
+        """Retourne le statut du token (mapping immuable précalculé)."""
+        return self._status
     
     def check_model_access(self, model_id: str, token: str) -> Dict[str, Any]:
         """
@@ -58,78 +301,135 @@ class TokenManager:
         Returns:
             Dict avec statut et détails de l'accès
         """
+        # Cache instance (TTL 5 min): time.monotonic est un appel vDSO,
+        # pas de syscall ni de hash/pickle Streamlit sur le chemin chaud
+        key = (model_id, hashlib.blake2s(token.encode(), digest_size=8).hexdigest())
+        now = time.monotonic()
+        hit = self._access_cache.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+
+        token_hash = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
         try:
-            from huggingface_hub import hf_hub_download
-            
-            # Tentative de téléchargement de la config
-            config_path = hf_hub_download(
-                repo_id=model_id,
-                filename="config.yaml",
-                token=token,
-                local_files_only=False
-            )
-            
-            return {
-                "success": True,
-                "message": "Accès au modèle confirmé",
-                "config_path": config_path
-            }
-            
+            result = _check_model_access_cached(model_id, token_hash, token)
+        except _AccessCheckFailed as e:
+            # Échec jamais mis en cache: la prochaine vérification
+            # re-sollicite le hub (panne transitoire, token corrigé, etc.)
+            return e.result
+        self._access_cache[key] = (now + 300, result)
+        return result
+
+    def check_models_access(self, model_ids: List[str], token: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Vérifie l'accès à plusieurs modèles en parallèle (segmentation +
+        diarisation + embedding, par exemple). Les requêtes hub sont
+        I/O-bound et relâchent le GIL: le fan-out en threads ramène le
+        temps mur de N·RTT à ~1·RTT.
+
+        Args:
+            model_ids: Liste d'IDs de modèles à vérifier
+            token: Token HF à vérifier
+
+        Returns:
+            Dict {model_id: statut d'accès}
+        """
+        if not model_ids:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(8, len(model_ids))) as executor:
+            results = executor.map(lambda m: self.check_model_access(m, token), model_ids)
+            return dict(zip(model_ids, results))
+
+    async def _check_async(self, session: "aiohttp.ClientSession",
+                           model_id: str, token: str) -> Dict[str, Any]:
+        """Vérifie un modèle via l'API REST du hub (GET /api/models/{id})."""
+        try:
+            async with session.get(
+                f"https://huggingface.co/api/models/{model_id}",
+                headers={"Authorization": f"Bearer {token}"},
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as resp:
+                if resp.status == 200:
+                    return {
+                        "success": True,
+                        "message": "Accès au modèle confirmé"
+                    }
+                return _access_error(
+                    resp.status, model_id, f"Erreur d'accès: HTTP {resp.status}"
+                )
         except Exception as e:
-            error_msg = str(e)
-            
-            if "401" in error_msg or "Unauthorized" in error_msg:
-                return {
-                    "success": False,
-                    "message": "Token invalide ou expiré",
-                    "details": "Vérifiez que votre token HF est valide et non expiré"
-                }
-            elif "403" in error_msg or "Forbidden" in error_msg:
-                return {
-                    "success": False,
-                    "message": "Conditions d'utilisation non acceptées",
-                    "details": f"Vous devez accepter les conditions d'utilisation pour {model_id} sur HuggingFace"
-                }
-            elif "404" in error_msg or "Not Found" in error_msg:
-                return {
-                    "success": False,
-                    "message": "Modèle non trouvé",
-                    "details": f"Le modèle {model_id} n'existe pas ou n'est pas accessible"
-                }
-            else:
-                return {
-                    "success": False,
-                    "message": f"Erreur d'accès: {error_msg}",
-                    "details": "Vérifiez votre connexion réseau et les permissions"
-                }
+            return _access_error(None, model_id, f"Erreur d'accès: {e}")
+
+    async def check_models_access_async(self, model_ids: List[str],
+                                        token: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Variante asynchrone de check_models_access: les N requêtes partagent
+        une même ClientSession (keep-alive + cache DNS), la boucle
+        d'événements reste réactive pendant les vérifications.
+
+        Args:
+            model_ids: Liste d'IDs de modèles à vérifier
+            token: Token HF à vérifier
+
+        Returns:
+            Dict {model_id: statut d'accès}
+        """
+        if not model_ids:
+            return {}
+
+        if not _AIOHTTP_OK:
+            # Repli synchrone si aiohttp n'est pas installé
+            return {m: self.check_model_access(m, token) for m in model_ids}
+
+        connector = aiohttp.TCPConnector(limit=16, ttl_dns_cache=300)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            results = await asyncio.gather(
+                *[self._check_async(session, m, token) for m in model_ids]
+            )
+        return dict(zip(model_ids, results))
+
+    async def check_model_access_async(self, model_id: str, token: str) -> Dict[str, Any]:
+        """Vérification d'accès asynchrone d'un seul modèle."""
+        results = await self.check_models_access_async([model_id], token)
+        return results[model_id]
     
     @staticmethod
     def get_torch_device():
         """
         Détermine le meilleur device Torch disponible.
-        
+
+        Le résultat est mémoïzé au niveau module: la topologie des devices
+        ne change pas en cours de process, inutile de re-sonder CUDA/MPS
+        à chaque rerun Streamlit.
+
         Returns:
             torch.device object
         """
-        try:
-            import torch
-            
-            # Priorité: MPS (Mac M1/M2), CUDA, CPU
-            if torch.backends.mps.is_available():
-                return torch.device("mps")
-            elif torch.cuda.is_available():
-                return torch.device("cuda")
-            else:
-                return torch.device("cpu")
-                
-        except ImportError:
-            return torch.device("cpu")
-        except Exception as e:
-            logger.warning(f"Erreur détection device: {e}, fallback CPU")
-            return torch.device("cpu")
+        return _detect_device()
     
     def refresh_token(self) -> bool:
         """Rafraîchit le token depuis les sources."""
+        # Sources inchangées (mtime des secrets + env): rien à relire
+        if (self._secrets_mtime_now() == self._secrets_mtime
+                and os.environ.get("HUGGINGFACE_HUB_TOKEN") == self._env_token):
+            return False
+
         old_token = self.token
         self._load_token()
-        return self.token != old_token
+        changed = self.token != old_token
+        if changed:
+            # Un nouveau token peut changer les droits d'accès
+            self._access_cache.clear()
+            _check_model_access_cached.clear()
+        return changed
+
+
+@st.cache_resource(show_spinner=False)
+def get_token_manager() -> TokenManager:
+    """
+    Singleton TokenManager par process. À préférer à TokenManager() dans
+    le code Streamlit: l'instance (token résolu, caches d'accès, device
+    sondé) survit aux reruns au lieu d'être reconstruite à chaque
+    interaction. cache_resource garde l'objet vivant sans le pickler.
+    """
+    return TokenManager()